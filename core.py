@@ -18,19 +18,47 @@ and the discrete moment at which this happens is sometimes called a tick (in oth
 The rules continue to be applied repeatedly to create further generations.
 '''
 
-import os
 import random
+import sys
+import time
 import numpy as np
 from typing import Dict, Tuple, Union
 import json
 from pathlib import Path
+from kernels import WORD, pack, unpack, read_cells, write_cells, popcount, interior_mask, count_neighbours, swar_step, HAS_NUMBA, numba_kernels, cython_step, cuda_step, cupy
+
+# Without a Qt binding, pyqtgraph raises a plain `Exception` on import, not an `ImportError`.
+try:
+    from graphic import GraphicGOL
+    from pyqtgraph.Qt import mkQApp
+except Exception:
+    GraphicGOL = mkQApp = None
+
+BACKENDS = ('numpy', 'bits', 'numba', 'cupy')
+
+# ANSI escape sequences : moving the cursor home and redrawing over the previous frame doesn't need a shell.
+CLEAR_SCREEN = '\x1b[H\x1b[2J'
+CURSOR_HOME = '\x1b[H'
+CLEAR_BELOW = '\x1b[J'
+
+# Above this ratio of living cells, `next_gen(sparse = 'auto')` uses the dense kernels : on 1000² to 2000² grids,
+# the sparse step is several times faster below 1%, on par with the dense kernels around 2-3% and far slower above.
+SPARSE_DENSITY = 0.02
+NEIGHBOURHOOD = np.array([(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)])
 
 
 class GameOfLife:
     
-    def __init__(self, height: int = None, width: int = None, config: Union[str, Path] = None, alive_char: str = '#', dead_char: str = '-', custom_config: Dict[bool, str] = None, graphic: bool = False) -> None:
+    def __init__(self, height: int = None, width: int = None, config: Union[str, Path] = None, alive_char: str = '#', dead_char: str = '-', custom_config: Dict[bool, str] = None, graphic: bool = False, backend: str = 'numpy') -> None:
         assert (height and width) or config, 'You must provide grid dimensions or a configuration file.'
+        assert backend in BACKENDS, f'Unknown backend \'{backend}\', expected one of {BACKENDS}.'
+        assert backend != 'numba' or HAS_NUMBA, 'The \'numba\' backend requires the numba library.'
+        assert backend != 'cupy' or cuda_step, 'The \'cupy\' backend requires the cupy library.'
+        assert not graphic or GraphicGOL, 'The graphic view requires the PyQt5 and pyqtgraph libraries.'
         self.graphic = graphic
+        self.backend = backend
+        if backend == 'numba':
+            self._numba_step, _ = numba_kernels()
         self.width = width
         self.shape = (height, width,) if height and width else None
         if config and config != '__random__':
@@ -48,31 +76,105 @@ class GameOfLife:
             self.config = None
         self.alive_char = alive_char
         self.dead_char = dead_char
+        self._lut = np.array([f'{dead_char} ', f'{alive_char} '])
+        # NumPy pads the shorter cell string with NULs, rows can then only be joined cell by cell.
+        self._uniform_cells = len(dead_char) == len(alive_char)
+        # Rendering of the 8 cells held by each byte value, for the 'bits' backend.
+        self._render_lut_256 = [''.join(self._lut[byte >> bit & 1] for bit in range(8)) for byte in range(256)]
+        self._render_buf = None
+        self._prev = None
+        self._clear_seq = CLEAR_SCREEN
 
     def __clear_shell(self) -> None:
-        _ = os.system('cls') if os.name == 'nt' else os.system('clear')
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
 
     def __rand_name(self, length) -> str:
         abc = 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_'
         return ''.join(random.sample(abc, length))
 
-    def __reload_shape(self) -> None:
-        self.shape = self.matrix.shape
-
     def __update_grid(self) -> None:
         """ Update the shape of the grid when a living cell come close to a border. """
-        if any(self.matrix[1, i] for i in range(self.shape[1])):
-            self.matrix = np.insert(self.matrix, 0, 0, axis = 0)
-            self.__reload_shape()
-        if any(self.matrix[-2, i] for i in range(self.shape[1])):
-            self.matrix = np.append(self.matrix, [[0] * self.shape[1]], axis = 0)
-            self.__reload_shape()
-        if any(self.matrix[j, 1] for j in range(self.shape[0])):
-            self.matrix = np.insert(self.matrix, 0, 0, axis = 1)
-            self.__reload_shape()
-        if any(self.matrix[j, -2] for j in range(self.shape[0])):
-            self.matrix = np.append(self.matrix, [[0] for _ in range(self.shape[0])], axis = 1)
-            self.__reload_shape()
+        grid = self._dev if self.backend == 'cupy' else self.matrix
+        top, bottom = int(grid[1].any()), int(grid[-2].any())
+        left, right = int(grid[:, 1].any()), int(grid[:, -2].any())
+        if not (top or bottom or left or right):
+            return
+        alive_x, alive_y = self._alive_x, self._alive_y
+        if self.backend == 'numpy':
+            self.__grow_storage(top, bottom, left, right)
+        else:
+            self.matrix = np.pad(self.matrix, ((top, bottom), (left, right)))
+        if alive_x is not None:
+            self._alive_x, self._alive_y = alive_x + top, alive_y + left
+
+    def __grow_storage(self, top: int, bottom: int, left: int, right: int) -> None:
+        """
+        Extends the grid over its storage, which is zero outside of the grid.
+        The storage is only reallocated, twice as big as the grid, when the grid reaches one of its edges.
+        """
+        (y, x), (height, width) = self._origin, self.shape
+        y, x = y - top, x - left
+        height, width = height + top + bottom, width + left + right
+        if y < 0 or x < 0 or y + height > self._storage.shape[0] or x + width > self._storage.shape[1]:
+            storage = np.zeros((2 * height, 2 * width), dtype = bool)
+            y, x = height // 2, width // 2
+            storage[y + top:y + height - bottom, x + left:x + width - right] = self._matrix
+            self._storage = storage
+        self._origin = (y, x)
+        self._matrix = self._storage[y:y + height, x:x + width]
+        self.__alloc_buffers(self._matrix.shape)
+        self.shape = self._matrix.shape
+
+    def __alloc_buffers(self, shape: Tuple[int]) -> None:
+        """ Persistent buffers of `next_gen` : the grid is copied inside a zero-padded one, whose halo is never written. """
+        height, width = shape
+        self._padded = np.zeros((height + 2, width + 2), dtype = np.uint8)
+        self._int = self._padded[1:-1, 1:-1]
+        self._neigh = np.empty(shape, dtype = np.uint8)
+
+    def __cells(self) -> np.ndarray:
+        """ Writable boolean grid of the 'numpy' and 'numba' backends. """
+        if self.backend == 'numba':
+            return self._a.view(np.bool_)
+        return self._matrix
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """
+        Read-only boolean view of the grid (unpacked on the fly with the 'bits' backend, copied from the GPU with 'cupy').
+        Cells are edited with `edit_state`, which also drops the living cells kept by the sparse generations.
+        """
+        if self.backend == 'bits':
+            cells = unpack(self._bits, self.shape[1])
+        elif self.backend == 'cupy':
+            cells = self._dev.get().view(np.bool_)
+        else:
+            cells = self.__cells().view()
+        cells.setflags(write = False)
+        return cells
+
+    @matrix.setter
+    def matrix(self, value: np.ndarray) -> None:
+        value = np.asarray(value, dtype = bool)
+        if self.backend == 'bits':
+            self._bits = pack(value)
+            self._mask = interior_mask(value.shape)
+        elif self.backend == 'numba':
+            # Two `uint8` buffers swapped at each generation, so that ticks don't allocate anything.
+            self._a = value.astype(np.uint8)
+            self._b = np.zeros_like(self._a)
+        elif self.backend == 'cupy':
+            self._dev = cupy.asarray(value.view(np.uint8))
+            self._dev_out = cupy.zeros_like(self._dev)
+        else:
+            # The grid is a view over a bigger storage, so that `__update_grid` rarely has to copy it.
+            self._storage = value.copy()
+            self._origin = (0, 0)
+            self._matrix = self._storage
+            self.__alloc_buffers(value.shape)
+        self.shape = value.shape
+        self._alive_x = self._alive_y = None
 
     def get_matrix(self) -> np.ndarray: return self.matrix 
 
@@ -84,46 +186,151 @@ class GameOfLife:
         except IndexError:
             return None
 
-    def next_gen(self, update_grid: bool = False) -> None:
+    def __sparse_gen(self) -> None:
+        """ Computes the next generation from the living cells and their neighbours only. """
+        height, width = self.shape
+        # The living cells are stored as two arrays of coordinates, so their neighbours are enumerated at once.
+        xs = (self._alive_x[:, None] + NEIGHBOURHOOD[:, 0]).ravel()
+        ys = (self._alive_y[:, None] + NEIGHBOURHOOD[:, 1]).ravel()
+        inner = (xs > 0) & (xs < height - 1) & (ys > 0) & (ys < width - 1)
+        cells, counts = np.unique(xs[inner] * width + ys[inner], return_counts = True)
+        xs, ys = np.divmod(cells, width)
+        if self.backend == 'bits':
+            # The packed words are updated in place, unpacking the whole grid would cost O(H·W).
+            alive = (counts == 3) | ((counts == 2) & read_cells(self._bits, xs, ys))
+            write_cells(self._bits, self._alive_x, self._alive_y, False)
+            write_cells(self._bits, xs[alive], ys[alive], True)
+        else:
+            matrix = self._dev.get().view(np.bool_) if self.backend == 'cupy' else self.__cells()
+            alive = (counts == 3) | ((counts == 2) & matrix[xs, ys])
+            matrix[self._alive_x, self._alive_y] = False
+            matrix[xs[alive], ys[alive]] = True
+            if self.backend == 'cupy':
+                self.matrix = matrix
+        self._alive_x, self._alive_y = xs[alive], ys[alive]
+
+    def next_gen(self, update_grid: bool = False, sparse: Union[bool, str] = 'auto') -> None:
+        """
+        Computes the next generation. With `sparse`, only the living cells and their neighbours are visited,
+        which is much faster on mostly empty grids ; 'auto' chooses it when at most 2% of the cells are alive.
+        """
         if update_grid:
             self.__update_grid()
-        int_matrix = self.matrix.astype(int)
-        neigh = np.zeros(int_matrix.shape)
-        neigh[1:-1, 1:-1] = (
-            int_matrix[:-2, :-2]  + int_matrix[:-2, 1:-1] + int_matrix[:-2, 2:]  + 
-            int_matrix[1:-1, :-2] +                         int_matrix[1:-1, 2:] + 
-            int_matrix[2:, :-2]   + int_matrix[2:, 1:-1]  + int_matrix[2:, 2:]
-        )
-        self.matrix = np.logical_or(
-            neigh == 3, 
-            np.logical_and(int_matrix == 1, neigh == 2)
-        )
+        if sparse == 'auto' and self.backend == 'cupy':
+            # Living cells would have to be copied back from the GPU at each generation.
+            sparse = False
+        if sparse == 'auto':
+            population = self.live_count()
+            sparse = population <= SPARSE_DENSITY * self.shape[0] * self.shape[1]
+        if sparse:
+            if self._alive_x is None:
+                self._alive_x, self._alive_y = np.nonzero(self.matrix)
+            self.__sparse_gen()
+            return
+        self._alive_x = self._alive_y = None
+        if self.backend == 'bits':
+            self._bits = swar_step(self._bits, self._mask)
+            return
+        if self.backend == 'numba':
+            self._numba_step(self._a, self._b)
+            self._a, self._b = self._b, self._a
+            return
+        if self.backend == 'cupy':
+            cuda_step(self._dev, self._dev_out)
+            self._dev, self._dev_out = self._dev_out, self._dev
+            return
+        cells = self._int
+        np.copyto(cells, self._matrix)
+        if cython_step:
+            # Measured faster than both neighbour counts below (0.9 ms against 5 to 7 ms per tick on a 2000² grid).
+            cython_step(self._padded, self._neigh)
+            np.copyto(self._matrix, self._neigh.view(np.bool_))
+            return
+        count_neighbours(self._padded, self._neigh)
+        np.logical_or(self._neigh == 3, cells & (self._neigh == 2), out = self._matrix)
+
+    def run_batched(self, generations: int, batch: int = 8) -> None:
+        """
+        Computes `generations` generations at once, without displaying them nor updating the grid size.
+        With numba, `batch` generations are computed on each band of rows before moving to the next one.
+        """
+        assert batch > 0, 'The batch size must be a positive number of generations.'
+        if not HAS_NUMBA:
+            for _ in range(generations):
+                self.next_gen()
+            return
+        _, numba_batch = numba_kernels()
+        if self.backend == 'numba':
+            grid, out = self._a, self._b
+        else:
+            grid = self.matrix.astype(np.uint8)
+            out = np.empty_like(grid)
+        while generations > 0:
+            numba_batch(grid, out, min(batch, generations))
+            grid, out = out, grid
+            generations -= batch
+        if self.backend == 'numba':
+            self._a, self._b = grid, out
+            self._alive_x = self._alive_y = None
+        else:
+            self.matrix = grid
 
     def edit_state(self, cell: Tuple[int], state: bool):
         x, y = cell
-        self.matrix[x][y] = state
+        if self.backend == 'bits':
+            word, bit = divmod(range(self.shape[1])[y], WORD)
+            if state:
+                self._bits[x, word] |= np.uint64(1 << bit)
+            else:
+                self._bits[x, word] &= ~np.uint64(1 << bit)
+        elif self.backend == 'cupy':
+            self._dev[x, y] = state
+        else:
+            self.__cells()[x, y] = state
+        self._alive_x = self._alive_y = None
+
+    def live_count(self) -> int:
+        """ Number of living cells. """
+        if self.backend == 'bits':
+            return popcount(self._bits)
+        if self.backend == 'cupy':
+            return int(cupy.count_nonzero(self._dev))
+        if self._alive_x is not None:
+            return len(self._alive_x)
+        return int(np.count_nonzero(self.matrix))
 
     def view(self) -> str:
-        temp = self.matrix
-        string = ''
-        for line in temp:
-            for cell in line:
-                string += f'{self.alive_char} ' if cell else f'{self.dead_char} '
-            string += '\n'
-        return string
+        if self.backend == 'bits' and self._uniform_cells:
+            # Rendered 8 cells at a time, straight from the packed bytes (the cut below needs same-width cells).
+            lut = self._render_lut_256
+            length = self.shape[1] * len(lut[0]) // 8
+            rows = self._bits.view(np.uint8)[:, :-(-self.shape[1] // 8)].tolist()
+            return '\n'.join(''.join([lut[byte] for byte in row])[:length] for row in rows) + '\n'
+        matrix = self.matrix
+        if self._prev is None or self._prev.shape != matrix.shape:
+            self._render_buf = self._lut[matrix.view(np.uint8)]
+            self._prev = matrix.copy()
+        else:
+            # Only the cells that changed since the last frame are written again.
+            changed = np.nonzero(matrix ^ self._prev)
+            self._render_buf[changed] = self._lut[matrix[changed].view(np.uint8)]
+            np.copyto(self._prev, matrix)
+        if not self._uniform_cells:
+            return '\n'.join(''.join(row) for row in self._render_buf.tolist()) + '\n'
+        # Each row of cell strings is reinterpreted as a single string of the whole line.
+        lines = self._render_buf.view(f'U{matrix.shape[1] * self._lut.itemsize // 4}').ravel()
+        return '\n'.join(lines) + '\n'
 
     def __shell_run(self, wait_time: float) -> None:
-        import sys
-        import time
-
         i = 1
         while 1:
             try:
-                self.__clear_shell()
                 self.next_gen()
-                print(f'\n\nGeneration [{i}]')
-                print(self.view())
-                print(f'x: {self.shape[0]}\ny: {self.shape[1]}\n')
+                frame = f'\n\nGeneration [{i}]\n{self.view()}\nx: {self.shape[0]}\ny: {self.shape[1]}\n\n'
+                # The whole frame is written at once, over the previous one.
+                sys.stdout.write(self._clear_seq + frame + CLEAR_BELOW)
+                sys.stdout.flush()
+                self._clear_seq = CURSOR_HOME
                 time.sleep(wait_time)
                 i += 1
             except KeyboardInterrupt:
@@ -131,9 +338,6 @@ class GameOfLife:
                 sys.exit(1)
 
     def __graphic_run(self, wait_time: float) -> None:
-        from graphic import GraphicGOL
-        from pyqtgraph.Qt import mkQApp
-
         mkQApp("Game Of Life matrix display")
         graph = GraphicGOL(self)
         graph.run(int(wait_time * 1000))
@@ -150,11 +354,25 @@ class GameOfLife:
         if not path:
             path = Path(f'./{self.__rand_name(10)}.gol')
         with open(path.absolute(), 'w') as f:
-            f.writelines([str(list(self.matrix.astype(int)[i])) + '\n' for i in range(len(self.matrix))])
+            f.writelines([json.dumps(row) + '\n' for row in self.matrix.view(np.uint8).tolist()])
+
+    def save_npy(self, path: Path = None) -> None:
+        """ Saves the grid as a binary NumPy file, much faster to load than a `.gol` configuration. """
+        if not path:
+            path = Path(f'./{self.__rand_name(10)}.npy')
+        np.save(path.absolute(), self.matrix)
+
+    def load_npy(self, path: Path) -> None:
+        """ Loads a grid saved with `save_npy`. """
+        assert path.exists(), f'File \'{path.name}\' doesn\'t exist.'
+        self.matrix = np.load(path.absolute())
 
     def load_conf(self, path: Path, custom_repr: Dict[bool, str] = None) -> None:
-        """ Loads a file containing the default configuration. """
+        """ Loads a file containing the default configuration (`.npy` files are loaded with `load_npy`). """
         assert path.exists(), f'File \'{path.name}\' doesn\'t exist.'
+        if path.suffix == '.npy':
+            self.load_npy(path)
+            return
         with open(path.absolute()) as f:
             if custom_repr:
                 conf = [line.strip('\n') for line in f.readlines()]
@@ -163,12 +381,10 @@ class GameOfLife:
             else:
                 conf = [json.loads(line) for line in f.readlines()]
         self.matrix = np.asarray(conf)
-        self.__reload_shape()
 
     def __random_conf(self, shape: Tuple[int] = None):
         """ Generates a random matrix for testing purposes. """
         self.matrix = np.random.choice(a = [0, 1], size = shape or (75, 75))
-        self.__reload_shape()
 
     def __repr__(self) -> str:
         return f'GameOfLife(default_conf: "{self.config}", array: {self.shape})'
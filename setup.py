@@ -0,0 +1,15 @@
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+
+# Optional compiled kernel of the 'numpy' backend : python setup.py build_ext --inplace
+setup(
+    ext_modules = cythonize(
+        Extension(
+            '_gol_ext',
+            ['_gol_ext.pyx'],
+            extra_compile_args = ['-O3', '-march=native', '-fopenmp'],
+            extra_link_args = ['-fopenmp'],
+        ),
+        language_level = 3,
+    ),
+)